@@ -1,24 +1,42 @@
 from fastapi import FastAPI, UploadFile, File, Request, Form, Body, BackgroundTasks, HTTPException, Query
 from fastapi.responses import FileResponse, RedirectResponse
+from starlette.background import BackgroundTask
 from fastapi.templating import Jinja2Templates
 from fastapi.staticfiles import StaticFiles
-from fastapi.security import HTTPBasic, HTTPBasicCredentials
+from fastapi.security import HTTPBasicCredentials
 from fastapi import Depends
 
+import asyncio
+import base64
+import functools
+import hashlib
 import secrets
 import pika
 import json
 import shutil
+import socket
+import stat
 import subprocess
 import os
+import threading
+import time
 import uuid
 import logging
+import jinja2
 import markdown2
 
+# Optional UNO bridge (python3-uno); when missing we fall back to one-shot
+# `libreoffice --convert-to` invocations.
+try:
+    import uno
+    from com.sun.star.beans import PropertyValue
+    UNO_AVAILABLE = True
+except ImportError:
+    UNO_AVAILABLE = False
+
 RABBITMQ_HOST = os.getenv('RABBITMQ_HOST', 'rabbitmq')
 RABBITMQ_USER = os.getenv('RABBITMQ_USER', 'user')
 RABBITMQ_PASS = os.getenv('RABBITMQ_PASS', 'password')
-security = HTTPBasic()
 PDF_PRINTER_USER = os.getenv("PDF_PRINTER_USER", "admin")
 PDF_PRINTER_PASS = os.getenv("PDF_PRINTER_PASS", "password")
 # === Logging Setup ===
@@ -49,23 +67,223 @@ os.chmod(FONT_DIR, 0o777)
 app = FastAPI()
 logger.info("🚀 pdf-printer started and logging is active")
 app.mount("/static", StaticFiles(directory="static"), name="static")
-templates = Jinja2Templates(directory="templates")
 
-def verify_credentials(credentials: HTTPBasicCredentials = Depends(security)):
-    correct_username = secrets.compare_digest(credentials.username, PDF_PRINTER_USER)
-    correct_password = secrets.compare_digest(credentials.password, PDF_PRINTER_PASS)
-    if not (correct_username and correct_password):
+# Templates never change at runtime, so turn off auto-reload, persist compiled
+# bytecode across restarts, and compile everything up front instead of on the
+# first request to each page.
+JINJA_CACHE_DIR = "/tmp/jinja_cache"
+os.makedirs(JINJA_CACHE_DIR, exist_ok=True)
+_jinja_env = jinja2.Environment(
+    loader=jinja2.FileSystemLoader("templates"),
+    autoescape=jinja2.select_autoescape(),  # match Starlette's default env
+    auto_reload=False,
+    bytecode_cache=jinja2.FileSystemBytecodeCache(JINJA_CACHE_DIR),
+)
+templates = Jinja2Templates(env=_jinja_env)
+for _name in _jinja_env.list_templates():
+    _jinja_env.get_template(_name)
+
+# === RabbitMQ Connection (long-lived; opening per request costs ~150-200ms) ===
+# BlockingConnection is not thread-safe, so all use goes through _mq_lock.
+_mq_lock = threading.Lock()
+_mq = {"connection": None, "channel": None}
+
+def _open_mq_channel():
+    credentials = pika.PlainCredentials(RABBITMQ_USER, RABBITMQ_PASS)
+    connection = pika.BlockingConnection(pika.ConnectionParameters(
+        host=RABBITMQ_HOST,
+        credentials=credentials
+    ))
+    channel = connection.channel()
+    channel.queue_declare(queue='pdf_jobs', durable=True)
+    _mq["connection"] = connection
+    _mq["channel"] = channel
+    return channel
+
+def publish_job(body):
+    """Publish on the shared channel, reconnecting once if it has gone stale."""
+    with _mq_lock:
+        for attempt in (1, 2):
+            try:
+                channel = _mq["channel"] or _open_mq_channel()
+                channel.basic_publish(
+                    exchange='',
+                    routing_key='pdf_jobs',
+                    body=body,
+                    properties=pika.BasicProperties(delivery_mode=2)
+                )
+                return
+            except Exception as e:
+                connection = _mq["connection"]
+                _mq["connection"] = None
+                _mq["channel"] = None
+                if connection is not None:
+                    try:
+                        connection.close()
+                    except Exception:
+                        pass
+                if attempt == 2:
+                    raise
+                logger.warning(f"RabbitMQ publish failed ({e}); reconnecting")
+
+@app.on_event("startup")
+def connect_rabbitmq():
+    if RABBITMQ_HOST and RABBITMQ_USER and RABBITMQ_PASS:
+        try:
+            with _mq_lock:
+                _open_mq_channel()
+            logger.info("Connected to RabbitMQ at startup")
+        except Exception as e:
+            logger.warning(f"RabbitMQ not reachable at startup ({e}); will retry on first publish")
+
+# === LibreOffice Process (persistent; soffice cold start costs 1-3s per job) ===
+# One headless soffice is launched at startup listening on a UNO socket and
+# all conversions are submitted to it, so only the first job pays startup.
+UNO_PORT = 2002
+_lo_lock = asyncio.Lock()  # soffice UNO is effectively single-threaded
+_lo_process = None
+
+def start_soffice():
+    global _lo_process
+    _lo_process = subprocess.Popen([
+        "soffice", "--headless", "--invisible", "--norestore", "--nologo",
+        f'--accept=socket,host=localhost,port={UNO_PORT};urp;'
+    ])
+    for _ in range(60):
+        try:
+            with socket.create_connection(("localhost", UNO_PORT), timeout=1):
+                logger.info("Persistent soffice is up on the UNO socket")
+                return True
+        except OSError:
+            time.sleep(0.5)
+    logger.warning("soffice UNO socket never came up; using one-shot conversions")
+    return False
+
+def uno_convert(input_path, output_path, filter_data):
+    """Convert one file through the persistent soffice instance."""
+    local_ctx = uno.getComponentContext()
+    resolver = local_ctx.ServiceManager.createInstanceWithContext(
+        "com.sun.star.bridge.UnoUrlResolver", local_ctx)
+    ctx = resolver.resolve(
+        f"uno:socket,host=localhost,port={UNO_PORT};urp;StarOffice.ComponentContext")
+    desktop = ctx.ServiceManager.createInstanceWithContext(
+        "com.sun.star.frame.Desktop", ctx)
+
+    in_url = uno.systemPathToFileUrl(os.path.abspath(input_path))
+    out_url = uno.systemPathToFileUrl(os.path.abspath(output_path))
+    doc = desktop.loadComponentFromURL(
+        in_url, "_blank", 0, (PropertyValue(Name="Hidden", Value=True),))
+    if doc is None:
+        # loadComponentFromURL returns None for corrupt/unreadable input
+        raise RuntimeError(f"LibreOffice could not load {input_path}")
+    try:
+        export_props = [PropertyValue(Name="FilterName", Value="calc_pdf_Export")]
+        if filter_data:
+            props = tuple(PropertyValue(Name=k, Value=v) for k, v in filter_data.items())
+            export_props.append(PropertyValue(
+                Name="FilterData",
+                Value=uno.Any("[]com.sun.star.beans.PropertyValue", props)
+            ))
+        doc.storeToURL(out_url, tuple(export_props))
+    finally:
+        doc.close(False)
+
+# === Conversion Cache ===
+# Conversions are deterministic in (input bytes, lo_options), so bit-identical
+# repeat jobs are served from a hash-keyed cache instead of re-running soffice.
+PDF_CACHE_DIR = os.path.join(TMP_DIR, ".pdfcache")
+PDF_CACHE_MAX_ENTRIES = 256
+os.makedirs(PDF_CACHE_DIR, exist_ok=True)
+
+def pdf_cache_key(input_path, lo_options):
+    h = hashlib.blake2b(digest_size=16)
+    with open(input_path, "rb") as f:
+        while chunk := f.read(1 << 20):
+            h.update(chunk)
+    h.update((lo_options or "").encode())
+    return h.hexdigest()
+
+def pdf_cache_get(key, output_path):
+    cached = os.path.join(PDF_CACHE_DIR, f"{key}.pdf")
+    if not os.path.exists(cached):
+        return False
+    shutil.copy(cached, output_path)
+    os.utime(cached)  # touch so eviction treats it as recently used
+    return True
+
+def pdf_cache_put(key, output_path):
+    cached = os.path.join(PDF_CACHE_DIR, f"{key}.pdf")
+    try:
+        if not os.path.exists(cached):
+            os.link(output_path, cached)
+    except OSError:
+        shutil.copy(output_path, cached)
+    evict_pdf_cache()
+
+def evict_pdf_cache():
+    entries = []
+    with os.scandir(PDF_CACHE_DIR) as it:
+        for e in it:
+            # an entry can vanish between readdir and stat (concurrent
+            # eviction or manual cleanup on the shared volume); skip it
+            try:
+                if e.is_file():
+                    entries.append((e.stat().st_mtime, e.path))
+            except OSError:
+                pass
+    if len(entries) > PDF_CACHE_MAX_ENTRIES:
+        for _, path in sorted(entries)[:len(entries) - PDF_CACHE_MAX_ENTRIES]:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+async def run_conversion(input_path, output_path, filter_data, fallback_cmd):
+    """Convert via the persistent soffice, or the one-shot CLI if UNO is unusable."""
+    if UNO_AVAILABLE and _lo_process is not None and _lo_process.poll() is None:
+        async with _lo_lock:
+            await asyncio.to_thread(uno_convert, input_path, output_path, filter_data)
+        return
+    result = await asyncio.to_thread(
+        subprocess.run, fallback_cmd, capture_output=True, text=True
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"LibreOffice failed: {result.stderr}")
+
+@app.on_event("startup")
+def launch_libreoffice():
+    if UNO_AVAILABLE:
+        start_soffice()
+    else:
+        logger.info("UNO bridge not available; conversions will spawn soffice per job")
+
+# The expected Authorization header is precomputed once, so each request is a
+# single constant-time compare instead of a b64decode + split + two compares.
+EXPECTED_AUTH_HEADER = b"Basic " + base64.b64encode(
+    f"{PDF_PRINTER_USER}:{PDF_PRINTER_PASS}".encode()
+)
+
+def verify_credentials(request: Request):
+    auth_header = request.headers.get("authorization", "").encode()
+    if not secrets.compare_digest(auth_header, EXPECTED_AUTH_HEADER):
         raise HTTPException(
             status_code=401,
             detail="Unauthorized",
             headers={"WWW-Authenticate": "Basic"},
         )
 
-# Load README and convert to HTML
+# Load README and convert to HTML (cached; re-rendered only when the file changes)
+_README_CACHE = {"mtime": None, "html": None}
+
 def get_readme_html():
-    if os.path.exists(README_PATH):
-        return markdown2.markdown_path(README_PATH)
-    return "<p>README not found.</p>"
+    try:
+        mtime = os.stat(README_PATH).st_mtime
+    except OSError:
+        return "<p>README not found.</p>"
+    if _README_CACHE["mtime"] != mtime:
+        _README_CACHE["html"] = markdown2.markdown_path(README_PATH)
+        _README_CACHE["mtime"] = mtime
+    return _README_CACHE["html"]
 
 # === Index Page (README) ===
 @app.get("/")
@@ -77,41 +295,95 @@ def index(request: Request):
     })
 
 # === PDFs Page ===
+# Listing is cached for a second, keyed on the directory mtime, so refresh
+# bursts don't rescan a shared volume full of intermediate files.
+_PDFS_CACHE = {"key": None, "expires": 0.0, "files": []}
+
+def get_pdf_files():
+    key = os.stat(TMP_DIR).st_mtime_ns
+    now = time.monotonic()
+    if _PDFS_CACHE["key"] == key and now < _PDFS_CACHE["expires"]:
+        return _PDFS_CACHE["files"]
+    # scandir skips the per-entry stat that listdir+isfile would pay
+    with os.scandir(TMP_DIR) as it:
+        pdf_files = sorted(
+            e.name for e in it
+            if e.name.endswith('.pdf') and e.is_file(follow_symlinks=False)
+        )
+    _PDFS_CACHE.update(key=key, expires=now + 1.0, files=pdf_files)
+    return pdf_files
+
+def invalidate_pdfs_cache():
+    _PDFS_CACHE["expires"] = 0.0
+
 @app.get("/pdfs")
 def list_pdfs(request: Request):
-    files = os.listdir(TMP_DIR)
-    pdf_files = sorted([f for f in files if f.endswith('.pdf')])
     return templates.TemplateResponse("pdfs.html", {
         "request": request,
-        "pdf_files": pdf_files
+        "pdf_files": get_pdf_files()
     })
 
 # === Fonts Page ===
+# Font inventory only changes via /upload-font, so cache the fc-list output
+# and invalidate it there instead of forking fc-list on every GET.
+_FONTS_CACHE = None
+
+def rebuild_font_cache():
+    # Rescan only our font dir (not every system font path) and refresh the
+    # in-memory list once fontconfig is done.
+    global _FONTS_CACHE
+    subprocess.run(["fc-cache", "-f", FONT_DIR])
+    _FONTS_CACHE = None
+
+def get_fonts():
+    global _FONTS_CACHE
+    if _FONTS_CACHE is None:
+        result = subprocess.run(
+            ["fc-list", ":", "file", "family"],
+            capture_output=True, text=True
+        )
+        _FONTS_CACHE = sorted(set(line.strip() for line in result.stdout.splitlines()))
+    return _FONTS_CACHE
+
 @app.get("/fonts")
 def list_fonts(request: Request):
-    fonts_output = os.popen("fc-list : file family").readlines()
-    fonts = sorted(set(line.strip() for line in fonts_output))
     return templates.TemplateResponse("fonts.html", {
         "request": request,
-        "fonts": fonts
+        "fonts": get_fonts()
     })
 
 # === RabbitMQ Queue Stats ===
+# Depth is fetched over the shared connection and cached for 2s, so dashboard
+# auto-refresh doesn't cost an AMQP round trip per page load; on transient
+# errors the last known value is shown.
+_QUEUE_STATS_CACHE = {"expires": 0.0, "queue_len": None}
+
 @app.get("/queue-stats")
 def queue_stats(request: Request):
-    queue_len = None
-    try:
-        credentials = pika.PlainCredentials(RABBITMQ_USER, RABBITMQ_PASS)
-        connection = pika.BlockingConnection(pika.ConnectionParameters(host=RABBITMQ_HOST, credentials=credentials))
-        channel = connection.channel()
-        result = channel.queue_declare(queue='pdf_jobs', durable=True)
-        queue_len = result.method.message_count
-        connection.close()
-    except Exception as e:
-        logger.error(f"Failed to fetch queue stats: {e}")
+    now = time.monotonic()
+    if now >= _QUEUE_STATS_CACHE["expires"]:
+        try:
+            with _mq_lock:
+                channel = _mq["channel"] or _open_mq_channel()
+                result = channel.queue_declare(queue='pdf_jobs', durable=True)
+            _QUEUE_STATS_CACHE["queue_len"] = result.method.message_count
+        except Exception as e:
+            # Reset under the lock (publish_job checks _mq["channel"] while
+            # holding it) and close the dead connection instead of leaking it.
+            with _mq_lock:
+                connection = _mq["connection"]
+                _mq["connection"] = None
+                _mq["channel"] = None
+                if connection is not None:
+                    try:
+                        connection.close()
+                    except Exception:
+                        pass
+            logger.error(f"Failed to fetch queue stats: {e}")
+        _QUEUE_STATS_CACHE["expires"] = now + 2.0
     return templates.TemplateResponse("queue.html", {
         "request": request,
-        "queue_len": queue_len
+        "queue_len": _QUEUE_STATS_CACHE["queue_len"]
     })
 
 # === Test Endpoint ===
@@ -122,6 +394,7 @@ def hello():
 # === Upload Font ===
 @app.post("/upload-font")
 async def upload_font(
+    background_tasks: BackgroundTasks,
     font_file: UploadFile = File(...),
     credentials: HTTPBasicCredentials = Depends(verify_credentials)  # <-- protect this route
 ):
@@ -133,7 +406,7 @@ async def upload_font(
     with open(font_path, "wb") as f:
         shutil.copyfileobj(font_file.file, f)
 
-    os.system("fc-cache -fv")
+    background_tasks.add_task(rebuild_font_cache)
     logger.info(f"Installed font: {font_file.filename}")
     return RedirectResponse(url="/fonts", status_code=303)
 
@@ -146,6 +419,7 @@ async def delete_file(
     file_path = os.path.join(TMP_DIR, filename)
     if os.path.exists(file_path):
         os.remove(file_path)
+        invalidate_pdfs_cache()
         logger.info(f"Deleted file: {file_path}")
     else:
         logger.warning(f"Tried to delete non-existent file: {file_path}")
@@ -158,10 +432,18 @@ async def get_file(
     credentials: HTTPBasicCredentials = Depends(verify_credentials)  # <-- protect this route
 ):
     file_path = os.path.join(TMP_DIR, filename)
-    if os.path.exists(file_path):
-        return FileResponse(file_path)
-    logger.warning(f"Requested file not found: {file_path}")
-    return {"error": "File not found"}
+    try:
+        st = os.stat(file_path)
+    except OSError:
+        st = None
+    # FileResponse skips its own is-regular-file check when given stat_result,
+    # so reject directories and other non-files here instead of 500ing at send
+    if st is None or not stat.S_ISREG(st.st_mode):
+        logger.warning(f"Requested file not found: {file_path}")
+        return {"error": "File not found"}
+    # Pass the stat through so Starlette skips its own and goes straight to sendfile
+    media_type = "application/pdf" if filename.endswith(".pdf") else None
+    return FileResponse(file_path, stat_result=st, media_type=media_type)
 
 
 # ====
@@ -184,24 +466,13 @@ async def queue_job(
 #         logger.info(f"get 1 body: {body_options}")
 
         if RABBITMQ_HOST and RABBITMQ_USER and RABBITMQ_PASS:
-            credentials = pika.PlainCredentials(RABBITMQ_USER, RABBITMQ_PASS)
-            connection = pika.BlockingConnection(pika.ConnectionParameters(
-                host=RABBITMQ_HOST,
-                credentials=credentials
-            ))
-            channel = connection.channel()
-            channel.queue_declare(queue='pdf_jobs', durable=True)
-            channel.basic_publish(
-                exchange='',
-                routing_key='pdf_jobs',
-                body=body_options,
-                properties=pika.BasicProperties(delivery_mode=2)
-            )
-            connection.close()
+            publish_job(body_options)
             return {"status": "queued", "file": file.filename}
         else:
             logger.warning("No RabbitMQ config; falling back to direct conversion")
-            return await convert_xlsx(file=file, lo_options=lo_options)
+            # The upload is already on disk at tmp_file; convert it in place
+            # instead of re-reading the (now exhausted) upload stream.
+            return await _convert_path(tmp_file, lo_options)
     except Exception as e:
         logger.error(f"Queue/convert failed: {e}")
         return {"error": str(e)}
@@ -214,10 +485,14 @@ def check_pdf(
     credentials: HTTPBasicCredentials = Depends(verify_credentials)  # <-- protect this route
 ):
     pdf_path = os.path.join(TMP_DIR, filename)
-    if not os.path.isfile(pdf_path):
+    try:
+        st = os.stat(pdf_path)
+    except OSError:
+        st = None
+    if st is None or not stat.S_ISREG(st.st_mode):
         raise HTTPException(status_code=404, detail="PDF not ready")
 
-    response = FileResponse(pdf_path, media_type="application/pdf", filename=filename)
+    response = FileResponse(pdf_path, stat_result=st, media_type="application/pdf", filename=filename)
 
     if delete:
         background_tasks.add_task(os.remove, pdf_path)
@@ -226,46 +501,87 @@ def check_pdf(
     return response
 
 # === Convert XLSX to PDF ===
-@app.post("/convert")
-async def convert_xlsx(
-    file: UploadFile = File(...),
-    lo_options: str = Form(default=None),
-    credentials: HTTPBasicCredentials = Depends(verify_credentials)  # <-- protect this route
-):
-    input_filename = file.filename
-    input_path = os.path.join(TMP_DIR, input_filename)
+# Deployments pass a handful of distinct option blobs, so parsing each raw
+# string once and reusing the result is effectively a hit-rate-1 cache.
+@functools.lru_cache(maxsize=128)
+def _parse_lo_options(raw):
+    if not raw:
+        return None
+    try:
+        return json.loads(raw)
+    except json.JSONDecodeError as e:
+        logger.warning(f"Invalid JSON in lo_options: {e}")
+        return None
+
+def _cleanup_job_files(*paths):
+    for p in paths:
+        try:
+            os.remove(p)
+        except FileNotFoundError:
+            pass
+
+async def _convert_path(input_path, lo_options, download_name=None):
+    """Convert an XLSX already saved at input_path and return the PDF response."""
     output_path = input_path.replace(".xlsx", ".pdf")
-    body_options = json.dumps({'lo_options': lo_options})
-    logger.info(f"lo options in convert: {body_options}")
     try:
-        with open(input_path, "wb") as f:
-            f.write(await file.read())
-        logger.info(f"Saved XLSX to: {input_path}")
-
         convert_cmd = [
             "libreoffice", "--headless", "--convert-to", "pdf", input_path, "--outdir", TMP_DIR
         ]
-
+        filter_data = None
         if lo_options:
             convert_filter = f'pdf:calc_pdf_Export:{lo_options}'
             convert_cmd = [
                 "libreoffice", "--headless", "--convert-to", convert_filter, input_path, "--outdir", TMP_DIR
             ]
+            filter_data = _parse_lo_options(lo_options)
 
-        result = subprocess.run(convert_cmd, capture_output=True, text=True)
-        if result.returncode != 0:
-            raise RuntimeError(f"LibreOffice failed: {result.stderr}")
+        # Hashing the input and copying cached PDFs are multi-MB file I/O;
+        # run them on a worker thread like the conversion itself.
+        cache_key = await asyncio.to_thread(pdf_cache_key, input_path, lo_options)
+        if await asyncio.to_thread(pdf_cache_get, cache_key, output_path):
+            logger.info(f"PDF served from conversion cache: {output_path}")
+        else:
+            await run_conversion(input_path, output_path, filter_data, convert_cmd)
+            await asyncio.to_thread(pdf_cache_put, cache_key, output_path)
 
         logger.info(f"PDF created: {output_path}")
-        return FileResponse(path=output_path, media_type="application/pdf", filename=os.path.basename(output_path))
+        # Delete the job files only after the response has streamed; the old
+        # blanket finally unlinked the PDF while Starlette was still sending it.
+        return FileResponse(
+            path=output_path,
+            media_type="application/pdf",
+            filename=download_name or os.path.basename(output_path),
+            background=BackgroundTask(_cleanup_job_files, input_path, output_path),
+        )
 
     except Exception as e:
         logger.exception("Conversion failed")
+        _cleanup_job_files(input_path, output_path)
         return {"error": str(e)}
 
-    finally:
-        for p in [input_path, output_path]:
-            if os.path.exists(p): os.remove(p)
+@app.post("/convert")
+async def convert_xlsx(
+    file: UploadFile = File(...),
+    lo_options: str = Form(default=None),
+    credentials: HTTPBasicCredentials = Depends(verify_credentials)  # <-- protect this route
+):
+    # Namespace the job so simultaneous uploads of the same filename don't
+    # clobber each other's files.
+    job_id = uuid.uuid4().hex
+    input_path = os.path.join(TMP_DIR, f"{job_id}_{file.filename}")
+    body_options = json.dumps({'lo_options': lo_options})
+    logger.info(f"lo options in convert: {body_options}")
+    try:
+        with open(input_path, "wb") as f:
+            shutil.copyfileobj(file.file, f, length=1 << 20)
+        logger.info(f"Saved XLSX to: {input_path}")
+    except Exception as e:
+        logger.exception("Saving upload failed")
+        return {"error": str(e)}
+    return await _convert_path(
+        input_path, lo_options,
+        download_name=file.filename.replace(".xlsx", ".pdf")
+    )
 
 @app.post("/convert-in-shared-dir")
 async def convert_in_shared_dir(
@@ -286,17 +602,13 @@ async def convert_in_shared_dir(
         logger.info(f"lo_options: {lo_options}")
         logger.info(f"delete_original: {delete_original}")
 
-        parsed_options = {}
-        if lo_options:
-            try:
-                parsed_options = json.loads(lo_options)
-#                 logger.info(f"Parsed options: {parsed_options}")
-            except json.JSONDecodeError as e:
-                logger.warning(f"Invalid JSON in lo_options: {e}")
+        parsed_options = _parse_lo_options(lo_options) or {}
 
         if parsed_options:
-#             json_options = json.dumps(parsed_options, separators=(",", ":"))
-            convert_filter = f'pdf:calc_pdf_Export:{parsed_options}'
+            # Re-dump to compact JSON: interpolating the dict repr would feed
+            # LibreOffice single quotes and True/False it can't parse.
+            json_options = json.dumps(parsed_options, separators=(",", ":"))
+            convert_filter = f'pdf:calc_pdf_Export:{json_options}'
             convert_cmd = [
                 "libreoffice", "--headless", "--convert-to", convert_filter, input_path, "--outdir", TMP_DIR
             ]
@@ -306,10 +618,13 @@ async def convert_in_shared_dir(
             ]
 
         logger.info(f"convert filter: {convert_cmd}")
-        result = subprocess.run(convert_cmd, capture_output=True, text=True)
-        if result.returncode != 0:
-            logger.error(f"LibreOffice failed: {result.stderr}")
-            raise RuntimeError(f"LibreOffice failed: {result.stderr}")
+        cache_key = await asyncio.to_thread(pdf_cache_key, input_path, lo_options)
+        if await asyncio.to_thread(pdf_cache_get, cache_key, output_path):
+            logger.info(f"PDF served from conversion cache: {output_path}")
+        else:
+            await run_conversion(input_path, output_path, parsed_options or None, convert_cmd)
+            await asyncio.to_thread(pdf_cache_put, cache_key, output_path)
+        invalidate_pdfs_cache()
 
         logger.info(f"PDF generated at: {output_path}")
 
@@ -3,6 +3,8 @@ import os
 import json
 import requests
 import time
+from concurrent.futures import ThreadPoolExecutor
+from requests.adapters import HTTPAdapter
 from requests.auth import HTTPBasicAuth
 
 RABBITMQ_HOST = os.getenv('RABBITMQ_HOST', 'rabbitmq')
@@ -14,7 +16,26 @@ RABBITMQ_PASS = os.getenv('RABBITMQ_PASS', 'password')
 PDF_PRINTER_USER = os.getenv("PDF_PRINTER_USER", "user")
 PDF_PRINTER_PASS = os.getenv("PDF_PRINTER_PASS", "password")
 
-def process_message(ch, method, properties, body):
+# Prefetch a window of messages and convert them on a thread pool; acks are
+# sent manually once the HTTP call to pdf-printer has finished. Size the pool
+# to match the printer's conversion capacity and prefetch double that so the
+# pool never starves between deliveries.
+WORKER_CONCURRENCY = int(os.getenv("WORKER_CONCURRENCY", "8"))
+PREFETCH_COUNT = WORKER_CONCURRENCY * 2
+executor = ThreadPoolExecutor(max_workers=WORKER_CONCURRENCY)
+
+# Acks are batched: completed jobs are acked with multiple=True once
+# ACK_BATCH of them finish or ACK_INTERVAL seconds pass, whichever first.
+ACK_BATCH = 8
+ACK_INTERVAL = 0.05
+
+# One session for all jobs: keep-alive sockets to pdf-printer instead of a
+# fresh TCP handshake + auth negotiation per message.
+SESSION = requests.Session()
+SESSION.auth = HTTPBasicAuth(PDF_PRINTER_USER, PDF_PRINTER_PASS)
+SESSION.mount("http://", HTTPAdapter(pool_connections=32, pool_maxsize=32))
+
+def process_message(body):
     try:
         message = json.loads(body)
         xlsx_filename = message.get('xlsx')
@@ -35,14 +56,17 @@ def process_message(ch, method, properties, body):
             'filename': xlsx_filename
         }
         if lo_options:
-            payload['lo_options'] = json.dumps(lo_options)  # send as string if needed
+            # queue_job already sends lo_options as a JSON string; pass it
+            # through untouched so the printer parses it exactly once
+            # (re-dumping a string here double-encoded it).
+            payload['lo_options'] = lo_options if isinstance(lo_options, str) else json.dumps(lo_options)
         if delete_original:
             payload['delete_original'] = delete_original  # send as string if needed
 
-        response = requests.post(
+        response = SESSION.post(
             PRINTER_API_URL,
             data=payload,
-            auth=HTTPBasicAuth(PDF_PRINTER_USER, PDF_PRINTER_PASS)
+            timeout=(3, 120)
         )
 
         if response.status_code == 200:
@@ -57,20 +81,93 @@ def process_message(ch, method, properties, body):
     except Exception as e:
         print(f"🔥 Error processing message: {e}")
 
+def run():
+    credentials = pika.PlainCredentials(RABBITMQ_USER, RABBITMQ_PASS)
+    parameters = pika.ConnectionParameters(host=RABBITMQ_HOST, credentials=credentials)
+    connection = None
+    completed_tags = set()
+    ack_state = {"channel": None, "last_acked": 0}
+
+    def flush_acks():
+        # multiple=True acks everything up to the given tag, so only advance
+        # across a contiguous run of completed tags.
+        channel = ack_state["channel"]
+        tag = ack_state["last_acked"]
+        while tag + 1 in completed_tags:
+            tag += 1
+            completed_tags.discard(tag)
+        if channel and channel.is_open and tag > ack_state["last_acked"]:
+            channel.basic_ack(delivery_tag=tag, multiple=True)
+            ack_state["last_acked"] = tag
+
+    def on_ack_timer():
+        flush_acks()
+        if connection.is_open:
+            connection.ioloop.call_later(ACK_INTERVAL, on_ack_timer)
+
+    def on_message(channel, method, properties, body):
+        # Hand the blocking HTTP call to the pool; completion is recorded on
+        # the IO loop thread (channel methods are not thread-safe) and acked
+        # in batches by flush_acks.
+        def work():
+            try:
+                process_message(body)
+            finally:
+                def record():
+                    completed_tags.add(method.delivery_tag)
+                    if len(completed_tags) >= ACK_BATCH:
+                        flush_acks()
+                connection.add_callback_threadsafe(record)
+        executor.submit(work)
+
+    def on_channel_open(channel):
+        ack_state["channel"] = channel
+        channel.basic_qos(prefetch_count=PREFETCH_COUNT)
+        channel.queue_declare(
+            queue=QUEUE_NAME, durable=True,
+            callback=lambda frame: channel.basic_consume(
+                queue=QUEUE_NAME, on_message_callback=on_message
+            )
+        )
+        connection.ioloop.call_later(ACK_INTERVAL, on_ack_timer)
+        print(" [*] Waiting for messages. To exit press CTRL+C")
+
+    def on_connection_open(conn):
+        conn.channel(on_open_callback=on_channel_open)
+
+    def on_connection_error(conn, error):
+        raise ConnectionError(f"Could not connect to RabbitMQ: {error}")
+
+    # An established connection dropping (broker restart, heartbeat timeout)
+    # only fires this callback; stop the ioloop so run() returns and main()'s
+    # retry loop can reconnect instead of idling forever.
+    close_reason = []
+
+    def on_connection_closed(conn, reason):
+        close_reason.append(reason)
+        conn.ioloop.stop()
+
+    connection = pika.SelectConnection(
+        parameters,
+        on_open_callback=on_connection_open,
+        on_open_error_callback=on_connection_error,
+        on_close_callback=on_connection_closed
+    )
+    try:
+        connection.ioloop.start()
+    except KeyboardInterrupt:
+        connection.close()
+        connection.ioloop.start()
+        raise
+    if close_reason:
+        raise ConnectionError(f"Connection to RabbitMQ closed: {close_reason[0]}")
+
 def main():
     while True:
         try:
-            credentials = pika.PlainCredentials(RABBITMQ_USER, RABBITMQ_PASS)
-            connection = pika.BlockingConnection(pika.ConnectionParameters(
-                host=RABBITMQ_HOST,
-                credentials=credentials
-            ))
-            channel = connection.channel()
-            channel.queue_declare(queue=QUEUE_NAME, durable=True)
-
-            channel.basic_consume(queue=QUEUE_NAME, on_message_callback=process_message, auto_ack=True)
-            print(" [*] Waiting for messages. To exit press CTRL+C")
-            channel.start_consuming()
+            run()
+        except KeyboardInterrupt:
+            break
         except Exception as e:
             print(f"🐇 RabbitMQ connection error: {e}. Retrying in 5s…")
             time.sleep(5)